@@ -0,0 +1,7 @@
+"""Process-wide cache of compiled JSONPath expressions."""
+
+from functools import lru_cache
+
+from jsonpath_ng.ext import parse
+
+compile_path = lru_cache(maxsize=64)(parse)
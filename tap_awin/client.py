@@ -1,14 +1,54 @@
 """REST client handling, including AwinStream base class."""
 
+import datetime
+import random
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import backoff
+import orjson
 import requests
-from typing import Callable, Iterable
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from typing import Any, Callable, Deque, Iterable, List, Optional, Tuple
 
 from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
-from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.streams import RESTStream
 from singer_sdk.authenticators import BearerTokenAuthenticator
 
+from tap_awin._jsonpath_cache import compile_path
+
+# Also the size of the shared connection pool, so every worker keeps its connection.
+MAX_CONCURRENT_REQUESTS = 20
+
+RETRIABLE_ERRORS = (RetriableAPIError, requests.exceptions.ConnectionError)
+MAX_TRIES = 10
+BACKOFF_FACTOR = 4
+
+_SIMPLE_JSONPATH = re.compile(r"^\$((?:\.\w+)*)\[\*\]$")
+
+
+def _simple_jsonpath_keys(expression: str) -> Optional[Tuple[str, ...]]:
+    """Return the keys of a `$.key[*]` style path, or None for any other path."""
+    match = _SIMPLE_JSONPATH.match(expression)
+    if match is None:
+        return None
+    return tuple(key for key in match.group(1).split(".") if key)
+
+
+class _OrjsonResponse(requests.Response):
+    """Response whose JSON body is decoded with orjson."""
+
+    def json(self, **kwargs: Any) -> Any:
+        """Return the decoded JSON body."""
+        return orjson.loads(self.content)
+
+
+def _use_orjson(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+    response.__class__ = _OrjsonResponse
+
 
 class AwinStream(RESTStream):
     """AWin stream class."""
@@ -18,13 +58,48 @@ class AwinStream(RESTStream):
     records_jsonpath = "$[*]"  # Or override `parse_response`.
     next_page_token_jsonpath = "$.next_page"  # Or override `get_next_page_token`.
 
+    _shared_session: Optional[requests.Session] = None
+    _records_keys: Optional[Tuple[str, ...]] = _simple_jsonpath_keys(records_jsonpath)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._records_keys = _simple_jsonpath_keys(cls.records_jsonpath)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream, reading per-request config values once."""
+        super().__init__(*args, **kwargs)
+        self._api_token = self.config.get("api_token")
+        self._timezone = self.config.get("timezone")
+        self._lookback_days = self.config.get("lookback_days")
+        self._bearer_authenticator: Optional[BearerTokenAuthenticator] = None
+
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return a keep-alive session shared by all Awin streams."""
+        if AwinStream._shared_session is None:
+            session = requests.Session()
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_connections=10,
+                    pool_maxsize=MAX_CONCURRENT_REQUESTS,
+                    max_retries=0,
+                )
+            )
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            session.hooks["response"].append(_use_orjson)
+            AwinStream._shared_session = session
+        return AwinStream._shared_session
+
     @property
     def authenticator(self) -> BearerTokenAuthenticator:
-        """Return a new authenticator object."""
-        return BearerTokenAuthenticator.create_for_stream(
-            self,
-            token=self.config.get("api_token")
-        )
+        """Return the authenticator object, creating it on first use."""
+        if self._bearer_authenticator is None:
+            self._bearer_authenticator = BearerTokenAuthenticator.create_for_stream(
+                self,
+                token=self._api_token
+            )
+        return self._bearer_authenticator
 
     @property
     def http_headers(self) -> dict:
@@ -36,34 +111,187 @@ class AwinStream(RESTStream):
 
     def parse_response(self, response: requests.Response) -> Iterable[dict]:
         """Parse the response and return an iterator of result rows."""
-        yield from extract_jsonpath(self.records_jsonpath, input=response.json())
+        yield from self._extract_records(response.json())
+
+    def _extract_records(self, data: Any) -> Iterable[dict]:
+        """Return the records at `records_jsonpath`, skipping jsonpath if trivial."""
+        if self._records_keys is None:
+            return self._find_records(data)
+        records = data
+        for key in self._records_keys:
+            if not isinstance(records, dict) or key not in records:
+                return []
+            records = records[key]
+        if not isinstance(records, list):
+            return self._find_records(data)
+        return records
+
+    def _find_records(self, data: Any) -> Iterable[dict]:
+        for match in compile_path(self.records_jsonpath).find(data):
+            yield match.value
 
     def validate_response(self, response: requests.Response) -> None:
-        if 200 < response.status_code <= 429:
-            msg = (
-                f"{response.status_code} Server Error: "
-                f"{response.reason} for path: {self.path}"
-            )
-            raise RetriableAPIError(msg)
-        elif 400 <= response.status_code < 500:
-            msg = (
-                f"{response.status_code} Client Error: "
-                f"{response.reason} for path: {self.path}"
-            )
-            raise FatalAPIError(msg)
+        """Raise a retriable error for 429 and 5xx, a fatal one for other 4xx."""
+        status_code = response.status_code
+        if status_code == 429 or 500 <= status_code < 600:
+            raise RetriableAPIError(self._error_message(response))
+        if 400 <= status_code < 500:
+            raise FatalAPIError(self._error_message(response))
 
-        elif 500 <= response.status_code < 600:
-            msg = (
-                f"{response.status_code} Server Error: "
-                f"{response.reason} for path: {self.path}"
-            )
-            raise RetriableAPIError(msg)
+    def _error_message(self, response: requests.Response) -> str:
+        error_type = "Server" if response.status_code >= 500 else "Client"
+        return (
+            f"{response.status_code} {error_type} Error: "
+            f"{response.reason} for path: {self.path}"
+        )
 
     def request_decorator(self, func: Callable) -> Callable:
         decorator: Callable = backoff.on_exception(
             backoff.expo,
-            (RetriableAPIError,),
-            max_tries=10,
-            factor=4,
+            RETRIABLE_ERRORS,
+            max_tries=MAX_TRIES,
+            factor=BACKOFF_FACTOR,
         )(func)
         return decorator
+
+
+class AwinDateSlicedStream(AwinStream):
+    """AWin stream requested as a sequence of date slices."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream and its url params builder."""
+        super().__init__(*args, **kwargs)
+        timezone, api_token = self._timezone, self._api_token
+        format_date = self.format_slice_date
+
+        def build_params(start_date: datetime.date, end_date: datetime.date) -> dict:
+            return {
+                'startDate': format_date(start_date),
+                'endDate': format_date(end_date),
+                'timezone': timezone,
+                'dateType': 'transaction',
+                'accessToken': api_token
+            }
+
+        self._build_params = build_params
+        self._sync_started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    def format_slice_date(self, date: datetime.date) -> str:
+        """Return a slice date formatted for the startDate/endDate params."""
+        return date.isoformat()
+
+    def get_url_params(
+        self, context: Optional[dict], next_page_token: Optional[Any]
+    ) -> dict:
+        """Return the URL params for the (start, end) date slice token."""
+        if next_page_token is None:
+            raise ValueError(
+                f"Stream '{self.name}' is requested by date slice and needs a "
+                "(start, end) date slice as its page token."
+            )
+        start_date, end_date = next_page_token
+        return self._build_params(start_date, end_date)
+
+    def get_batch_size_days(self) -> int:
+        """Return the number of days covered by a single request."""
+        return 1
+
+    def get_date_slices(
+        self, context: Optional[dict]
+    ) -> List[Tuple[datetime.date, datetime.date]]:
+        """Return the (start, end) date of every slice to request, oldest first."""
+        step = datetime.timedelta(days=self.get_batch_size_days())
+        if step <= datetime.timedelta(0):
+            raise ValueError(
+                f"Stream '{self.name}' date slices must cover at least one day."
+            )
+        starting_timestamp = self.get_starting_timestamp(context)
+        slice_start = (
+            starting_timestamp - datetime.timedelta(days=self._lookback_days)
+        ).date()
+        today = self._sync_started_at.astimezone(starting_timestamp.tzinfo).date()
+        date_slices = []
+        while True:
+            slice_end = min(slice_start + step, today)
+            date_slices.append((slice_start, slice_end))
+            if slice_end >= today:
+                return date_slices
+            slice_start = slice_end
+
+    def request_records(self, context: Optional[dict]) -> Iterable[dict]:
+        """Request all slices concurrently, yielding records in slice order."""
+        max_workers = max(1, self.config.get("max_concurrent_requests", 5))
+        if max_workers > MAX_CONCURRENT_REQUESTS:
+            self.logger.info(
+                f"Maximum concurrency is {MAX_CONCURRENT_REQUESTS} requests. "
+                f"Falling back to {MAX_CONCURRENT_REQUESTS} concurrent requests."
+            )
+            max_workers = MAX_CONCURRENT_REQUESTS
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending: Deque[Tuple[Tuple[datetime.date, datetime.date], Future]] = deque()
+        try:
+            for date_slice in self.get_date_slices(context):
+                prepared_request = self.prepare_request(
+                    context, next_page_token=date_slice
+                )
+                pending.append((
+                    date_slice,
+                    executor.submit(
+                        self._request_slice, prepared_request, context, cancelled
+                    ),
+                ))
+                if len(pending) >= max_workers:
+                    yield from self._parse_next_slice(pending)
+            while pending:
+                yield from self._parse_next_slice(pending)
+        finally:
+            # Don't wait on slices that may still be backing off after a failure.
+            cancelled.set()
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _request_slice(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: Optional[dict],
+        cancelled: threading.Event,
+    ) -> requests.Response:
+        """Send a slice request, retrying like `request_decorator` until cancelled.
+
+        Waiting on `cancelled` instead of sleeping lets a failed sync stop its
+        worker threads at once, rather than after their current backoff wait.
+        """
+        tries = 0
+        while True:
+            if cancelled.is_set():
+                raise FatalAPIError(
+                    "Request cancelled after another date slice failed."
+                )
+            tries += 1
+            try:
+                return self._request(prepared_request, context)
+            except RETRIABLE_ERRORS as error:
+                if tries >= MAX_TRIES:
+                    raise
+                # Full-jitter exponential wait, matching backoff.expo's defaults.
+                wait = random.uniform(0, BACKOFF_FACTOR * 2 ** (tries - 1))
+                self.logger.info(
+                    f"Backing off {wait:.1f} seconds after try {tries}: {error}"
+                )
+                cancelled.wait(wait)
+
+    def _parse_next_slice(
+        self, pending: Deque[Tuple[Tuple[datetime.date, datetime.date], Future]]
+    ) -> Iterable[dict]:
+        date_slice, future = pending.popleft()
+        return self.parse_slice_response(future.result(), date_slice)
+
+    def parse_slice_response(
+        self,
+        response: requests.Response,
+        date_slice: Tuple[datetime.date, datetime.date],
+    ) -> Iterable[dict]:
+        """Parse the response for the given (start, end) date slice."""
+        return self.parse_response(response)
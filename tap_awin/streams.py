@@ -1,18 +1,17 @@
 """Stream type classes for tap-awin."""
 
 import datetime
-from urllib.parse import urlparse
-from urllib.parse import parse_qs
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import requests
 from singer_sdk import typing as th  # JSON Schema typing helpers
-from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
-from singer_sdk.helpers.jsonpath import extract_jsonpath
 
-from tap_awin.client import AwinStream
+from tap_awin.client import AwinDateSlicedStream, AwinStream
 
-TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+AMOUNT_TYPE = th.ObjectType(
+    th.Property("amount", th.NumberType),
+    th.Property("currency", th.StringType),
+)
 
 
 class AccountsStream(AwinStream):
@@ -51,8 +50,22 @@ class AccountsStream(AwinStream):
             "account_type": record["accountType"]
         }
 
+    def _sync_children(self, child_context: dict) -> None:
+        """Sync child streams, skipping publishers for non-advertiser accounts."""
+        is_advertiser = child_context["account_type"] == "advertiser"
+        for child_stream in self.child_streams:
+            if isinstance(child_stream, PublishersStream) and not is_advertiser:
+                self.logger.debug(
+                    "Skipping account {account_id} publishers.".format(
+                        account_id=child_context["account_id"]
+                    )
+                )
+                continue
+            if child_stream.selected or child_stream.has_selected_descendents:
+                child_stream.sync(context=child_context)
+
 
-class TransactionsStream(AwinStream):
+class TransactionsStream(AwinDateSlicedStream):
     name = "transactions"
     parent_stream_type = AccountsStream
     ignore_parent_replication_keys = True
@@ -71,14 +84,8 @@ class TransactionsStream(AwinStream):
         th.Property("siteName", th.StringType),
         th.Property("campaign", th.StringType),
         th.Property("commissionStatus", th.StringType),
-        th.Property("commissionAmount", th.ObjectType(
-            th.Property("amount", th.NumberType),
-            th.Property("currency", th.StringType),
-        )),
-        th.Property("saleAmount", th.ObjectType(
-            th.Property("amount", th.NumberType),
-            th.Property("currency", th.StringType),
-        )),
+        th.Property("commissionAmount", AMOUNT_TYPE),
+        th.Property("saleAmount", AMOUNT_TYPE),
         th.Property("ipHash", th.StringType),
         th.Property("customerCountry", th.StringType),
         th.Property("clickRefs", th.ObjectType(
@@ -99,14 +106,8 @@ class TransactionsStream(AwinStream):
         th.Property("lapseTime", th.IntegerType),
         th.Property("amended", th.BooleanType),
         th.Property("amendReason", th.StringType),
-        th.Property("oldSaleAmount", th.ObjectType(
-            th.Property("amount", th.NumberType),
-            th.Property("currency", th.StringType),
-        )),
-        th.Property("oldCommissionAmount", th.ObjectType(
-            th.Property("amount", th.NumberType),
-            th.Property("currency", th.StringType),
-        )),
+        th.Property("oldSaleAmount", AMOUNT_TYPE),
+        th.Property("oldCommissionAmount", AMOUNT_TYPE),
         th.Property("clickDevice", th.StringType),
         th.Property("transactionDevice", th.StringType),
         th.Property("publisherUrl", th.StringType),
@@ -138,10 +139,7 @@ class TransactionsStream(AwinStream):
         th.Property("paymentId", th.IntegerType),
         th.Property("transactionQueryId", th.IntegerType),
         th.Property("originalSaleAmount", th.NumberType),
-        th.Property("advertiserCost", th.ObjectType(
-            th.Property("amount", th.NumberType),
-            th.Property("currency", th.StringType),
-        )),
+        th.Property("advertiserCost", AMOUNT_TYPE),
         th.Property("basketProducts", th.ArrayType(
             th.ObjectType(
                 th.Property("productId", th.StringType),
@@ -157,57 +155,28 @@ class TransactionsStream(AwinStream):
 
     def get_url_params(
         self, context: Optional[dict], next_page_token: Optional[Any]
-    ) -> Optional[dict]:
-        if isinstance(next_page_token, datetime.datetime):
-            start_date = next_page_token
-        else:
-            start_date = self.get_starting_timestamp(context) - datetime.timedelta(days=self.config.get("lookback_days"))
-        today = datetime.datetime.now(tz=start_date.tzinfo)
+    ) -> dict:
+        params = super().get_url_params(context, next_page_token)
+        self.logger.info(f"Requesting transaction data from {params['startDate']} to {params['endDate']}.")
+        return params
+
+    def format_slice_date(self, date: datetime.date) -> str:
+        """Return the slice date as a midnight timestamp."""
+        return f"{date.isoformat()}T00:00:00"
+
+    def get_batch_size_days(self) -> int:
+        """Return the configured request batch size, between 1 and Awin's 31 days."""
         batch_size_days = self.config.get("request_batch_size_days")
         if batch_size_days > 31:
             self.logger.info(f"Maximum day batch size is 31 days. Falling back to default batch size of 1 day.")
             batch_size_days = 1
-        end_date = min(start_date + datetime.timedelta(days=batch_size_days), today)
-        formatted_start_date = datetime.datetime.strftime(
-                start_date.replace(hour=0, minute=0, second=0, microsecond=0),
-                TIMESTAMP_FORMAT
-            )
-        formatted_end_date = datetime.datetime.strftime(
-                end_date.replace(hour=0, minute=0, second=0, microsecond=0),
-                TIMESTAMP_FORMAT
-            )
-        params = {
-            'startDate': formatted_start_date,
-            'endDate': formatted_end_date,
-            'timezone': self.config.get("timezone"),
-            'dateType': 'transaction',
-            'accessToken': self.config.get("api_token")
-        }
-        self.logger.info(f"Requesting transaction data from {formatted_start_date} to {formatted_end_date}.")
-        return params
-
-    def get_next_page_token(
-        self, response: requests.Response, previous_token: Optional[Any]
-    ) -> Optional[Any]:
-        """Return a token for identifying next page or None if no more pages."""
-        if self.next_page_token_jsonpath:
-            all_matches = extract_jsonpath(
-                self.next_page_token_jsonpath, response.json()
-            )
-            first_match = next(iter(all_matches), None)
-            next_page_token = first_match
-        elif response.headers.get("X-Next-Page", None):
-            next_page_token = response.headers.get("X-Next-Page", None)
-        else:
-            end_date = datetime.datetime.strptime(
-                parse_qs(urlparse(response.request.url).query)['endDate'][0],
-                TIMESTAMP_FORMAT
+        elif batch_size_days < 1:
+            self.logger.info(
+                "Minimum day batch size is 1 day. "
+                "Falling back to default batch size of 1 day."
             )
-            if end_date.date() < datetime.date.today():
-                next_page_token = end_date
-            else:
-                next_page_token = None
-        return next_page_token
+            batch_size_days = 1
+        return batch_size_days
 
 
 class PublishersStream(AwinStream):
@@ -249,37 +218,17 @@ class PublishersStream(AwinStream):
 
     def get_records(self, context: Optional[dict] = None) -> Iterable[Dict[str, Any]]:
         """Return a generator of row-type dictionary objects.
-        Each row emitted should be a dictionary of property names to their values.
+
+        AccountsStream never syncs this stream for non-advertiser accounts; the
+        check here only covers direct calls.
         """
-        if context["account_type"] != "advertiser":
+        if context and context["account_type"] != "advertiser":
             self.logger.debug("Skipping account {account_id} publishers.".format(account_id=context["account_id"]))
             return []
         return super().get_records(context)
 
-    def validate_response(self, response: requests.Response) -> None:
-        if response.status_code == 104:
-            msg = (
-                f"{response.status_code} Server Error: "
-                f"{response.reason} for path: {self.path}"
-            )
-            raise RetriableAPIError(msg)
-        elif 400 <= response.status_code < 500:
-            msg = (
-                f"{response.status_code} Client Error: "
-                f"{response.reason} for path: {self.path}"
-            )
-            raise FatalAPIError(msg)
-        elif 500 <= response.status_code < 600:
-            msg = (
-                f"{response.status_code} Server Error: "
-                f"{response.reason} for path: {self.path}"
-            )
-            raise RetriableAPIError(msg)
-
 
-REPORT_TIMESTAMP_FORMAT = "%Y-%m-%d"
-
-class ReportByPublisherStream(AwinStream):
+class ReportByPublisherStream(AwinDateSlicedStream):
     name = "report_by_publisher"
     parent_stream_type = AccountsStream
     ignore_parent_replication_keys = True
@@ -316,59 +265,13 @@ class ReportByPublisherStream(AwinStream):
         th.Property("tags", th.ArrayType(th.StringType)),
     ).to_dict()
 
-    def get_url_params(
-        self, context: Optional[dict], next_page_token: Optional[Any]
-    ) -> Optional[dict]:
-        if isinstance(next_page_token, datetime.datetime):
-            start_date = next_page_token
-        else:
-            start_date = self.get_starting_timestamp(context) - datetime.timedelta(days=self.config.get("lookback_days"))
-        today = datetime.datetime.now(tz=start_date.tzinfo)
-        end_date = min(start_date + datetime.timedelta(days=1), today)
-        params = {
-            'startDate': datetime.datetime.strftime(
-                start_date.replace(hour=0, minute=0, second=0, microsecond=0),
-                REPORT_TIMESTAMP_FORMAT
-            ),
-            'endDate': datetime.datetime.strftime(
-                end_date.replace(hour=0, minute=0, second=0, microsecond=0),
-                REPORT_TIMESTAMP_FORMAT
-            ),
-            'timezone': self.config.get("timezone"),
-            'dateType': 'transaction',
-            'accessToken': self.config.get("api_token")
-        }
-        return params
-
-    def get_next_page_token(
-        self, response: requests.Response, previous_token: Optional[Any]
-    ) -> Optional[Any]:
-        """Return a token for identifying next page or None if no more pages."""
-        if self.next_page_token_jsonpath:
-            all_matches = extract_jsonpath(
-                self.next_page_token_jsonpath, response.json()
-            )
-            first_match = next(iter(all_matches), None)
-            next_page_token = first_match
-        elif response.headers.get("X-Next-Page", None):
-            next_page_token = response.headers.get("X-Next-Page", None)
-        else:
-            end_date = datetime.datetime.strptime(
-                parse_qs(urlparse(response.request.url).query)['endDate'][0],
-                REPORT_TIMESTAMP_FORMAT
-            )
-            if end_date.date() < datetime.date.today():
-                next_page_token = end_date
-            else:
-                next_page_token = None
-        return next_page_token
-
-    def parse_response(self, response: requests.Response) -> Iterable[dict]:
-        response_json = response.json()
-        start_date = datetime.datetime.strptime(
-            parse_qs(urlparse(response.request.url).query)['startDate'][0],
-            REPORT_TIMESTAMP_FORMAT
-        )
-        for row in response_json:
-            row["transactionDate"] = start_date
-        yield from extract_jsonpath(self.records_jsonpath, input=response_json)
+    def parse_slice_response(
+        self,
+        response: requests.Response,
+        date_slice: Tuple[datetime.date, datetime.date],
+    ) -> Iterable[dict]:
+        """Parse the response, stamping each row with the slice's start date."""
+        transaction_date = datetime.datetime.combine(date_slice[0], datetime.time())
+        for row in self.parse_response(response):
+            row["transactionDate"] = transaction_date
+            yield row
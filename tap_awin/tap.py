@@ -55,6 +55,15 @@ class TapAwin(Tap):
             description="Number of days to batch in a single request. Maximum is 31.",
             default=1
         ),
+        th.Property(
+            "max_concurrent_requests",
+            th.IntegerType,
+            default=5,
+            description=(
+                "Maximum number of date batches to request concurrently. "
+                "Maximum is 20."
+            )
+        ),
             
     ).to_dict()
 
@@ -0,0 +1,249 @@
+"""Tests for the AwinStream base classes."""
+
+import datetime
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+from tap_awin._jsonpath_cache import compile_path
+from tap_awin.client import _simple_jsonpath_keys
+from tap_awin.tap import TapAwin
+
+CONFIG = {
+    "api_token": "test-token",
+    "start_date": "2021-01-01T00:00:00Z",
+}
+CONTEXT = {"account_id": 1, "account_type": "advertiser"}
+
+
+def get_stream(name, **config):
+    """Return the named stream of a tap built from the test config."""
+    tap = TapAwin(config={**CONFIG, **config}, parse_env_config=False)
+    return tap.streams[name]
+
+
+def date_slices(count):
+    """Return `count` consecutive one-day slices."""
+    first = datetime.date(2021, 1, 1)
+    return [
+        (first + datetime.timedelta(days=i), first + datetime.timedelta(days=i + 1))
+        for i in range(count)
+    ]
+
+
+def slice_response(prepared_request):
+    """Return a response with one record naming the request's start date."""
+    start_date = parse_qs(urlparse(prepared_request.url).query)["startDate"][0]
+    response = requests.Response()
+    response.status_code = 200
+    response._content = f'[{{"startDate": "{start_date}"}}]'.encode()
+    return response
+
+
+def test_request_records_yields_slices_in_order(monkeypatch):
+    stream = get_stream("transactions", max_concurrent_requests=4)
+    slices = date_slices(10)
+    monkeypatch.setattr(stream, "get_date_slices", lambda context: slices)
+
+    def fake_request(prepared_request, context):
+        # Later slices answer first, so any reordering would show up.
+        day = int(parse_qs(urlparse(prepared_request.url).query)["startDate"][0][8:10])
+        time.sleep(0.01 * (10 - day))
+        return slice_response(prepared_request)
+
+    monkeypatch.setattr(stream, "_request", fake_request)
+
+    records = list(stream.request_records(CONTEXT))
+
+    assert [record["startDate"] for record in records] == [
+        f"{start_date.isoformat()}T00:00:00" for start_date, _ in slices
+    ]
+
+
+@pytest.mark.parametrize(
+    "max_concurrent_requests,expected_limit", [(1, 1), (3, 3), (50, 20)]
+)
+def test_request_records_bounds_requests_in_flight(
+    monkeypatch, max_concurrent_requests, expected_limit
+):
+    stream = get_stream(
+        "transactions", max_concurrent_requests=max_concurrent_requests
+    )
+    monkeypatch.setattr(stream, "get_date_slices", lambda context: date_slices(40))
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def fake_request(prepared_request, context):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return slice_response(prepared_request)
+
+    monkeypatch.setattr(stream, "_request", fake_request)
+
+    assert len(list(stream.request_records(CONTEXT))) == 40
+    assert max_in_flight <= expected_limit
+
+
+def test_request_records_raises_without_waiting_for_other_slices(monkeypatch):
+    stream = get_stream("transactions", max_concurrent_requests=3)
+    monkeypatch.setattr(stream, "get_date_slices", lambda context: date_slices(10))
+    release = threading.Event()
+    requested_days = []
+
+    def fake_request(prepared_request, context):
+        start_date = parse_qs(urlparse(prepared_request.url).query)["startDate"][0]
+        requested_days.append(start_date)
+        if start_date.startswith("2021-01-01"):
+            raise FatalAPIError("404 Client Error")
+        release.wait(timeout=10)
+        return slice_response(prepared_request)
+
+    monkeypatch.setattr(stream, "_request", fake_request)
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(FatalAPIError):
+            list(stream.request_records(CONTEXT))
+        assert time.monotonic() - started < 5
+    finally:
+        release.set()
+    assert len(requested_days) <= 3
+
+
+def test_request_records_interrupts_retry_waits_after_failure(monkeypatch):
+    stream = get_stream("transactions", max_concurrent_requests=2)
+    monkeypatch.setattr(stream, "get_date_slices", lambda context: date_slices(2))
+    # Always take the longest backoff wait, so a sleeping worker would be obvious.
+    monkeypatch.setattr("tap_awin.client.random.uniform", lambda low, high: high)
+    sibling_retrying = threading.Event()
+    worker_threads = []
+
+    def fake_request(prepared_request, context):
+        worker_threads.append(threading.current_thread())
+        start_date = parse_qs(urlparse(prepared_request.url).query)["startDate"][0]
+        if start_date.startswith("2021-01-01"):
+            sibling_retrying.wait(timeout=5)
+            raise FatalAPIError("404 Client Error")
+        sibling_retrying.set()
+        raise RetriableAPIError("429 Client Error")
+
+    monkeypatch.setattr(stream, "_request", fake_request)
+
+    with pytest.raises(FatalAPIError, match="404"):
+        list(stream.request_records(CONTEXT))
+    started = time.monotonic()
+    for thread in worker_threads:
+        thread.join(timeout=5)
+    assert time.monotonic() - started < 1
+
+
+@pytest.mark.parametrize(
+    "status_code,expected_error",
+    [
+        (200, None),
+        (201, None),
+        (204, None),
+        (301, None),
+        (400, FatalAPIError),
+        (401, FatalAPIError),
+        (403, FatalAPIError),
+        (404, FatalAPIError),
+        (429, RetriableAPIError),
+        (500, RetriableAPIError),
+        (503, RetriableAPIError),
+    ],
+)
+def test_validate_response(status_code, expected_error):
+    stream = get_stream("accounts")
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "Reason"
+
+    if expected_error is None:
+        stream.validate_response(response)
+    else:
+        with pytest.raises(expected_error, match=f"^{status_code} "):
+            stream.validate_response(response)
+
+
+@pytest.mark.parametrize(
+    "error,expected_calls",
+    [
+        (RetriableAPIError("429 Client Error"), 2),
+        (requests.exceptions.ConnectionError("Connection reset by peer"), 2),
+        (FatalAPIError("404 Client Error"), 1),
+    ],
+)
+def test_request_decorator_retries(monkeypatch, error, expected_calls):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    stream = get_stream("accounts")
+    calls = []
+
+    def request():
+        calls.append(None)
+        if len(calls) == 1:
+            raise error
+        return "response"
+
+    decorated_request = stream.request_decorator(request)
+
+    if expected_calls == 1:
+        with pytest.raises(type(error)):
+            decorated_request()
+    else:
+        assert decorated_request() == "response"
+    assert len(calls) == expected_calls
+
+
+@pytest.mark.parametrize(
+    "records_jsonpath,data",
+    [
+        ("$[*]", [{"id": 1}, {"id": 2}]),
+        ("$[*]", []),
+        ("$[*]", {"id": 1}),
+        ("$[*]", None),
+        ("$.accounts[*]", {"accounts": [{"accountId": 1}, {"accountId": 2}]}),
+        ("$.accounts[*]", {"accounts": []}),
+        ("$.accounts[*]", {"other": [{"accountId": 1}]}),
+        ("$.accounts[*]", {"accounts": {"accountId": 1}}),
+        ("$.accounts[*]", {"accounts": None}),
+        ("$.accounts[*]", [{"accounts": [{"accountId": 1}]}]),
+        ("$.accounts[*]", None),
+        ("$.data.accounts[*]", {"data": {"accounts": [{"accountId": 1}]}}),
+        ("$.data.accounts[*]", {"data": [{"accounts": [{"accountId": 1}]}]}),
+        ("$.accounts[0]", {"accounts": [{"accountId": 1}, {"accountId": 2}]}),
+    ],
+)
+def test_extract_records_matches_jsonpath(records_jsonpath, data):
+    stream = get_stream("accounts")
+    stream.records_jsonpath = records_jsonpath
+    stream._records_keys = _simple_jsonpath_keys(records_jsonpath)
+
+    expected = [match.value for match in compile_path(records_jsonpath).find(data)]
+
+    assert list(stream._extract_records(data)) == expected
+
+
+def test_simple_jsonpath_keys():
+    assert get_stream("accounts")._records_keys == ("accounts",)
+    assert get_stream("transactions")._records_keys == ()
+    assert _simple_jsonpath_keys("$.accounts[0]") is None
+    assert _simple_jsonpath_keys("$..accounts[*]") is None
+
+
+def test_get_date_slices_rejects_non_positive_batch_size(monkeypatch):
+    stream = get_stream("report_by_publisher")
+    monkeypatch.setattr(stream, "get_batch_size_days", lambda: 0)
+
+    with pytest.raises(ValueError, match="report_by_publisher"):
+        stream.get_date_slices(CONTEXT)
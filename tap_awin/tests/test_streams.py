@@ -0,0 +1,78 @@
+"""Tests for the tap-awin stream classes."""
+
+import requests
+
+from tap_awin.tap import TapAwin
+
+CONFIG = {
+    "api_token": "test-token",
+    "start_date": "2021-01-01T00:00:00Z",
+}
+
+
+def get_publishers_stream(monkeypatch):
+    """Return the publishers stream with `_request` recording its calls."""
+    stream = TapAwin(config=CONFIG, parse_env_config=False).streams["publishers"]
+    requested_urls = []
+
+    def fake_request(prepared_request, context):
+        requested_urls.append(prepared_request.url)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'[{"id": 1, "name": "Publisher"}]'
+        return response
+
+    monkeypatch.setattr(stream, "_request", fake_request)
+    return stream, requested_urls
+
+
+def test_publishers_skips_publisher_accounts(monkeypatch, capsys):
+    stream, requested_urls = get_publishers_stream(monkeypatch)
+
+    stream.sync({"account_id": 1, "account_type": "publisher"})
+
+    assert requested_urls == []
+    assert '"type": "RECORD"' not in capsys.readouterr().out
+
+
+def test_publishers_syncs_advertiser_accounts(monkeypatch, capsys):
+    stream, requested_urls = get_publishers_stream(monkeypatch)
+
+    stream.sync({"account_id": 2, "account_type": "advertiser"})
+
+    assert len(requested_urls) == 1
+    assert "/advertisers/2/publishers/" in requested_urls[0]
+    assert '"type": "RECORD"' in capsys.readouterr().out
+
+
+def test_accounts_skips_publishers_child_for_publisher_accounts(monkeypatch):
+    tap = TapAwin(config=CONFIG, parse_env_config=False)
+    accounts = tap.streams["accounts"]
+    synced = []
+    for child_stream in accounts.child_streams:
+        monkeypatch.setattr(
+            child_stream,
+            "sync",
+            lambda context, name=child_stream.name: synced.append(name),
+        )
+
+    accounts._sync_children({"account_id": 1, "account_type": "publisher"})
+
+    assert "publishers" not in synced
+    assert {"transactions", "report_by_publisher"} <= set(synced)
+
+
+def test_accounts_syncs_publishers_child_for_advertiser_accounts(monkeypatch):
+    tap = TapAwin(config=CONFIG, parse_env_config=False)
+    accounts = tap.streams["accounts"]
+    synced = []
+    for child_stream in accounts.child_streams:
+        monkeypatch.setattr(
+            child_stream,
+            "sync",
+            lambda context, name=child_stream.name: synced.append(name),
+        )
+
+    accounts._sync_children({"account_id": 2, "account_type": "advertiser"})
+
+    assert {"publishers", "transactions", "report_by_publisher"} <= set(synced)